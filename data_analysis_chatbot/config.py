@@ -1,14 +1,20 @@
 """
 Configuration management for the Data Analysis Chatbot.
 """
+import math
 import os
 import yaml
-import json
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 from loguru import logger
 
+from data_analysis_chatbot.json_utils import json_loads
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -43,8 +49,12 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
             "chunk_size": 1000,
             "chunk_overlap": 200,
             "vector_db": {
-                "type": "chroma",  # chroma, faiss, pinecone
+                "type": "faiss",  # chroma, faiss, pinecone
                 "persist_directory": "data/vectordb",
+                # FAISS index spec; PQ48 stores 48 bytes per vector (M is lowered to a
+                # divisor of the embedding dimension when 48 does not divide it)
+                "index_factory": "IVF4096,PQ48",
+                "nprobe": 16,  # IVF lists scanned per query
             },
         },
         "llm": {
@@ -73,10 +83,9 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
             try:
                 if file_path.suffix.lower() in [".yaml", ".yml"]:
                     with open(file_path, "r") as f:
-                        file_config = yaml.safe_load(f)
+                        file_config = yaml.load(f, Loader=_YAML_LOADER)
                 elif file_path.suffix.lower() == ".json":
-                    with open(file_path, "r") as f:
-                        file_config = json.load(f)
+                    file_config = json_loads(file_path.read_bytes())
                 else:
                     logger.warning(f"Unsupported config file format: {file_path.suffix}")
                     file_config = {}
@@ -105,11 +114,21 @@ def _deep_merge(target: Dict, source: Dict) -> Dict:
     Returns:
         Merged dictionary
     """
-    for key, value in source.items():
-        if key in target and isinstance(target[key], dict) and isinstance(value, dict):
+    common = target.keys() & source.keys()
+    if not common:
+        # No overlap, nothing to recurse into
+        target.update(source)
+        return target
+
+    for key in common:
+        value = source[key]
+        if isinstance(target[key], dict) and isinstance(value, dict):
             _deep_merge(target[key], value)
         else:
             target[key] = value
+
+    if len(common) < len(source):
+        target.update({key: value for key, value in source.items() if key not in common})
     return target
 
 def _override_from_env(config: Dict, prefix: str = "APP_") -> None:
@@ -124,27 +143,56 @@ def _override_from_env(config: Dict, prefix: str = "APP_") -> None:
         config: Configuration dictionary to update
         prefix: Prefix for environment variables
     """
-    for env_key, env_value in os.environ.items():
-        if env_key.startswith(prefix):
-            # Remove prefix and split by double underscore
-            key_path = env_key[len(prefix):].lower().split("__")
-            
-            # Convert env value to appropriate type
-            if env_value.lower() in ["true", "false"]:
-                env_value = env_value.lower() == "true"
-            elif env_value.isdigit():
-                env_value = int(env_value)
-            elif env_value.replace(".", "", 1).isdigit() and env_value.count(".") == 1:
-                env_value = float(env_value)
-            
-            # Apply the value to the nested config
-            curr_dict = config
-            for i, path_part in enumerate(key_path):
-                if i == len(key_path) - 1:
-                    # Last part of the path, set the value
-                    curr_dict[path_part] = env_value
-                else:
-                    # Create nested dict if it doesn't exist
-                    if path_part not in curr_dict:
-                        curr_dict[path_part] = {}
-                    curr_dict = curr_dict[path_part]
\ No newline at end of file
+    for key_path, env_value in _parsed_env(prefix):
+        # Apply the value to the nested config
+        curr_dict = config
+        for path_part in key_path[:-1]:
+            # Create nested dict if it doesn't exist
+            if path_part not in curr_dict:
+                curr_dict[path_part] = {}
+            curr_dict = curr_dict[path_part]
+        curr_dict[key_path[-1]] = env_value
+
+@lru_cache(maxsize=None)
+def _parsed_env(prefix: str) -> Tuple[Tuple[Tuple[str, ...], Any], ...]:
+    """
+    Collect and parse the prefixed environment variables.
+    
+    The environment is read once per prefix and cached, since it does not
+    change after startup (.env is loaded at import time).
+    
+    Args:
+        prefix: Prefix for environment variables
+        
+    Returns:
+        Tuple of (key path, typed value) pairs
+    """
+    return tuple(
+        (tuple(env_key[len(prefix):].lower().split("__")), _coerce(env_value))
+        for env_key, env_value in os.environ.items()
+        if env_key.startswith(prefix)
+    )
+
+def _coerce(value: str) -> Any:
+    """
+    Convert an environment variable value to an appropriate type.
+    
+    Args:
+        value: Raw environment variable value
+        
+    Returns:
+        The value as bool, int, float or str
+    """
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    # Keep strings such as "nan" or "inf" as they are
+    return number if math.isfinite(number) else value
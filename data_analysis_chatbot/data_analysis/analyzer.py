@@ -1,15 +1,147 @@
 """
 Data analysis functions.
 """
+from collections import Counter
+import math
+import warnings
 from typing import Dict, Any, List, Union, Optional, Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+from joblib import Parallel, delayed, effective_n_jobs
 from loguru import logger
 import traceback
 
-from data_analysis_chatbot.data_analysis.processors import preprocess_data
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+# Order of the rows returned by _numeric_stats
+_NUMERIC_STATS = ("min", "max", "mean", "median", "std", "skew")
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _fused_moments(values: np.ndarray) -> np.ndarray:
+        """
+        Compute count, min, max, mean, M2 and M3 per column in one sweep.
+        
+        Uses Welford's online update for the central moments, with columns
+        processed in parallel. fastmath is left off as it would drop the NaN
+        checks.
+        
+        Args:
+            values: 2D float64 array, one column per DataFrame column
+            
+        Returns:
+            Array of shape (6, n_columns)
+        """
+        n_rows, n_cols = values.shape
+        out = np.empty((6, n_cols))
+        for j in prange(n_cols):
+            count = 0
+            col_min = np.inf
+            col_max = -np.inf
+            mean = 0.0
+            m2 = 0.0
+            m3 = 0.0
+            for i in range(n_rows):
+                x = values[i, j]
+                if np.isnan(x):
+                    continue
+                prev_count = count
+                count += 1
+                delta = x - mean
+                delta_n = delta / count
+                term = delta * delta_n * prev_count
+                mean += delta_n
+                m3 += term * delta_n * (count - 2) - 3.0 * delta_n * m2
+                m2 += term
+                if x < col_min:
+                    col_min = x
+                if x > col_max:
+                    col_max = x
+            out[0, j] = count
+            if count == 0:
+                out[1:, j] = np.nan
+            else:
+                out[1, j] = col_min
+                out[2, j] = col_max
+                out[3, j] = mean
+                out[4, j] = m2
+                out[5, j] = m3
+        return out
+else:
+    _fused_moments = None
+
+
+def _numpy_moments(values: np.ndarray) -> np.ndarray:
+    """
+    Compute count, min, max, mean, M2 and M3 per column with NumPy.
+    
+    Each quantity is one NaN-aware reduction along axis 0; the central
+    moments come from a single deviation matrix.
+    
+    Args:
+        values: 2D float64 array, one column per DataFrame column
+        
+    Returns:
+        Array of shape (6, n_columns)
+    """
+    with warnings.catch_warnings():
+        # All-NaN columns warn and yield NaN, which is what we report
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        count = np.count_nonzero(~np.isnan(values), axis=0)
+        mins = np.nanmin(values, axis=0)
+        maxs = np.nanmax(values, axis=0)
+        means = np.nanmean(values, axis=0)
+        
+        deviations = values - means
+        squared = deviations * deviations
+        m2 = np.nansum(squared, axis=0)
+        m3 = np.nansum(squared * deviations, axis=0)
+    return np.vstack([count, mins, maxs, means, m2, m3])
+
+
+def _numeric_stats(values: np.ndarray) -> np.ndarray:
+    """
+    Compute summary statistics for the columns of a float matrix.
+    
+    The raw moments come from the fused Numba kernel when Numba is
+    installed, otherwise from NumPy reductions. std uses ddof=1 and skew
+    the adjusted Fisher-Pearson estimator, matching pandas.
+    
+    Args:
+        values: 2D float64 array, one column per DataFrame column
+        
+    Returns:
+        Array of shape (len(_NUMERIC_STATS), n_columns), NaN where undefined
+    """
+    n_cols = values.shape[1]
+    if values.shape[0] == 0:
+        return np.full((len(_NUMERIC_STATS), n_cols), np.nan)
+    
+    moments = _fused_moments(values) if _fused_moments is not None else _numpy_moments(values)
+    count, mins, maxs, means, m2, m3 = moments
+    
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        medians = np.nanmedian(values, axis=0)
+        
+        # Treat floating point noise as zero, as pandas does
+        m2[np.abs(m2) < 1e-14] = 0.0
+        m3[np.abs(m3) < 1e-14] = 0.0
+        
+        std = np.sqrt(m2 / (count - 1))
+        skew = (count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2 ** 1.5)
+    
+    std[count < 2] = np.nan
+    skew = np.where(m2 == 0, 0.0, skew)
+    skew[count < 3] = np.nan
+    return np.vstack([mins, maxs, means, medians, std, skew])
 
 
 class DataAnalyzer:
@@ -39,45 +171,111 @@ class DataAnalyzer:
         """
         try:
             # Basic info
+            columns = df.columns.tolist()
             result = {
                 "shape": df.shape,
-                "columns": df.columns.tolist(),
-                "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
-                "null_counts": df.isnull().sum().to_dict(),
-                "memory_usage": df.memory_usage(deep=True).sum() / (1024 * 1024),  # in MB
+                "columns": columns,
+                "dtypes": dict(zip(columns, df.dtypes.astype(str).tolist())),
+                "null_counts": dict(zip(columns, df.isnull().sum().tolist())),
+                "memory_usage": self._estimate_memory_usage(df) / (1024 * 1024),  # in MB
             }
             
             # Numeric columns analysis
             numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
             if numeric_cols:
-                result["numeric_analysis"] = {}
-                for col in numeric_cols:
-                    result["numeric_analysis"][col] = {
-                        "min": float(df[col].min()) if not pd.isna(df[col].min()) else None,
-                        "max": float(df[col].max()) if not pd.isna(df[col].max()) else None,
-                        "mean": float(df[col].mean()) if not pd.isna(df[col].mean()) else None,
-                        "median": float(df[col].median()) if not pd.isna(df[col].median()) else None,
-                        "std": float(df[col].std()) if not pd.isna(df[col].std()) else None,
-                        "skew": float(df[col].skew()) if not pd.isna(df[col].skew()) else None,
+                stats = self._compute_numeric_stats(df[numeric_cols])
+                result["numeric_analysis"] = {
+                    col: {
+                        stat: value if not math.isnan(value) else None
+                        for stat, value in zip(_NUMERIC_STATS, col_stats)
                     }
+                    for col, col_stats in zip(numeric_cols, stats.T.tolist())
+                }
             
             # Categorical columns analysis
             cat_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
             if cat_cols:
                 result["categorical_analysis"] = {}
                 for col in cat_cols:
-                    value_counts = df[col].value_counts().head(10).to_dict()
+                    # Single counting pass; most_common selects the top 10 without a full sort
+                    counts = Counter(df[col].dropna().to_numpy())
                     result["categorical_analysis"][col] = {
-                        "unique_count": df[col].nunique(),
-                        "top_values": {str(k): int(v) for k, v in value_counts.items()},
+                        "unique_count": len(counts),
+                        "top_values": {str(k): int(v) for k, v in counts.most_common(10)},
                     }
             
             # Datetime columns analysis
             date_cols = df.select_dtypes(include=["datetime"]).columns.tolist()
             if date_cols:
                 result["datetime_analysis"] = {}
+                date_mins = df[date_cols].min()
+                date_maxs = df[date_cols].max()
                 for col in date_cols:
+                    col_min, col_max = date_mins[col], date_maxs[col]
+                    if pd.isna(col_min):
+                        result["datetime_analysis"][col] = {"min": None, "max": None, "range_days": None}
+                        continue
                     result["datetime_analysis"][col] = {
-                        "min": df[col].min().isoformat() if not pd.isna(df[col].min()) else None,
-                        "max": df[col].max().isoformat() if not pd.isna(df[col].max()) else None,
-                        "range_days": (df[col].max() - df[col].min()).days if not pd.isna(df[col].min
\ No newline at end of file
+                        "min": col_min.isoformat(),
+                        "max": col_max.isoformat(),
+                        "range_days": (col_max - col_min).days,
+                    }
+            
+            return result
+        except Exception as e:
+            logger.error(f"Error analyzing DataFrame: {e}")
+            logger.debug(traceback.format_exc())
+            return {"error": str(e)}
+    
+    def _compute_numeric_stats(self, numeric_df: pd.DataFrame) -> np.ndarray:
+        """
+        Compute numeric summary statistics, splitting wide frames across threads.
+        
+        The columns are extracted once as a float64 matrix. Without Numba,
+        NumPy reductions release the GIL, so column blocks are reduced
+        concurrently once the frame has at least parallel_min_columns columns.
+        
+        Args:
+            numeric_df: DataFrame containing only numeric columns
+            
+        Returns:
+            Array of shape (len(_NUMERIC_STATS), n_columns)
+        """
+        values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        n_jobs = effective_n_jobs(self.config.get("n_jobs", -1))
+        if (
+            _fused_moments is not None  # already parallel over columns
+            or n_jobs == 1
+            or values.shape[1] < self.config.get("parallel_min_columns", 64)
+        ):
+            return _numeric_stats(values)
+        
+        blocks = [block for block in np.array_split(np.arange(values.shape[1]), n_jobs) if len(block)]
+        parts = Parallel(n_jobs=len(blocks), prefer="threads")(
+            delayed(_numeric_stats)(values[:, block]) for block in blocks
+        )
+        return np.hstack(parts)
+    
+    def _estimate_memory_usage(self, df: pd.DataFrame) -> float:
+        """
+        Estimate the memory usage of a DataFrame in bytes.
+        
+        Fixed-width columns are measured exactly. Object columns of large
+        frames are sized deeply on a leading sample only and extrapolated,
+        avoiding a getsizeof call for every stored Python object.
+        
+        Args:
+            df: Pandas DataFrame
+            
+        Returns:
+            Estimated memory usage in bytes
+        """
+        sample_rows = self.config.get("memory_sample_rows", 1000)
+        obj_cols = df.select_dtypes(include=["object"]).columns
+        if len(obj_cols) == 0 or len(df) <= 2 * sample_rows:
+            return float(df.memory_usage(deep=True).sum())
+        
+        mem = df.memory_usage(deep=False).astype(float)
+        sample = df[obj_cols].iloc[:sample_rows].memory_usage(index=False, deep=True)
+        mem.loc[obj_cols] = sample * (len(df) / sample_rows)
+        return float(mem.sum())
@@ -5,13 +5,11 @@ Database manager for handling database connections and operations.
 
 
 import os
-from typing import Dict, Any, Optional, List, Tuple
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from sqlalchemy.ext.declarative import declarative_base
+from typing import TYPE_CHECKING, Dict, Any, Iterator, Optional, List, Tuple
 from loguru import logger
 
-Base = declarative_base()
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
 
 class DatabaseManager:
     """
@@ -28,8 +26,8 @@ class DatabaseManager:
         """
         self.config = config
         self.engine = None
-        self.session_factory = None
-        self.session = None
+        # Session factory; use as `with db_manager.Session.begin() as session: ...`
+        self.Session = None
         self.db_type = config.get("type", "sqlite").lower()
         self.connection_string = config.get("connection_string", "sqlite:///data/chatbot.db")
         
@@ -55,18 +53,72 @@ class DatabaseManager:
         """
         Initialize SQL database (SQLite or PostgreSQL).
         """
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from data_analysis_chatbot.database.models import Base
+        
+        connect_args = {}
+        if self.connection_string.startswith("postgresql+psycopg://"):
+            # Let psycopg 3 prepare statements server-side once they repeat
+            connect_args["prepare_threshold"] = self.config.get("prepare_threshold", 5)
+        
         self.engine = create_engine(
             self.connection_string,
+            future=True,
             pool_size=self.config.get("pool_size", 5),
             max_overflow=self.config.get("max_overflow", 10),
+            pool_pre_ping=True,
+            # Compiled SQL is cached per statement, so repeated lookups skip compilation
+            query_cache_size=self.config.get("query_cache_size", 1200),
+            connect_args=connect_args,
             echo=self.config.get("echo", False),
         )
         
-        self.session_factory = sessionmaker(bind=self.engine)
-        self.session = scoped_session(self.session_factory)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        
+        # Create tables unless this schema version was already applied
+        if not self._schema_applied():
+            Base.metadata.create_all(self.engine)
+            self._record_schema_version()
+    
+    def _schema_applied(self) -> bool:
+        """
+        Check the sentinel table for the current schema version.
+        
+        A single-row lookup replaces the per-table existence checks that
+        create_all would issue on every startup.
+        
+        Returns:
+            True if the current schema version has been applied
+        """
+        from sqlalchemy import select
+        from sqlalchemy.exc import DBAPIError
+        from data_analysis_chatbot.database.models import SCHEMA_VERSION, SchemaMeta
+        
+        try:
+            with self.engine.connect() as connection:
+                row = connection.execute(
+                    select(SchemaMeta.version).where(SchemaMeta.version == SCHEMA_VERSION)
+                ).first()
+        except DBAPIError:
+            # The sentinel table does not exist yet
+            return False
+        return row is not None
+    
+    def _record_schema_version(self) -> None:
+        """
+        Record the current schema version in the sentinel table.
+        """
+        from sqlalchemy import insert
+        from sqlalchemy.exc import IntegrityError
+        from data_analysis_chatbot.database.models import SCHEMA_VERSION, SchemaMeta
         
-        # Create tables if they don't exist
-        Base.metadata.create_all(self.engine)
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(insert(SchemaMeta).values(version=SCHEMA_VERSION))
+        except IntegrityError:
+            # Another process recorded it first
+            pass
     
     def _init_mongodb(self) -> None:
         """
@@ -79,70 +131,79 @@ class DatabaseManager:
         self.db = client[db_name]
         logger.info(f"Connected to MongoDB: {db_name}")
     
-    def get_session(self) -> Session:
+    def get_session(self) -> "Session":
         """
-        Get a database session.
+        Get a new database session.
+        
+        The caller owns the session. Prefer `with db_manager.Session.begin() as session:`,
+        which commits on success, rolls back on error and closes the session.
         
         Returns:
             Database session
         """
         if self.db_type in ["sqlite", "postgresql"]:
-            return self.session()
+            return self.Session()
         raise ValueError(f"Sessions not supported for database type: {self.db_type}")
     
-    def close_session(self, session: Session) -> None:
+    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
-        Close a database session.
+        Execute a raw SQL query.
         
         Args:
-            session: Database session to close
-        """
-        if session:
-            session.close()
-    
-    def commit_session(self, session: Session) -> None:
+            query: SQL query string
+            params: Query parameters
+            
+        Returns:
+            List of dictionaries containing query results
         """
-        Commit changes in a database session.
+        if self.db_type not in ["sqlite", "postgresql"]:
+            raise ValueError(f"Raw queries not supported for database type: {self.db_type}")
         
-        Args:
-            session: Database session to commit
-        """
-        if session:
-            try:
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error committing session: {e}")
-                raise
+        from sqlalchemy import text
+        
+        # begin() commits on success, so INSERT/UPDATE statements are persisted
+        with self.engine.begin() as connection:
+            cursor = connection.execute(text(query), params or {})
+            if not cursor.returns_rows:
+                return []
+            return [dict(row) for row in cursor.mappings().all()]
     
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def iter_query(
+        self, query: str, params: Optional[Dict[str, Any]] = None, batch_size: int = 1000
+    ) -> Iterator[List[Dict[str, Any]]]:
         """
-        Execute a raw SQL query.
+        Execute a raw SQL query and stream the results in batches.
+        
+        Uses a server-side cursor where the driver supports it, so only one
+        batch of rows is held in memory at a time.
         
         Args:
             query: SQL query string
             params: Query parameters
+            batch_size: Number of rows per batch
             
-        Returns:
-            List of dictionaries containing query results
+        Yields:
+            Lists of dictionaries containing query results
         """
         if self.db_type not in ["sqlite", "postgresql"]:
             raise ValueError(f"Raw queries not supported for database type: {self.db_type}")
         
-        result = []
-        with self.engine.connect() as connection:
-            cursor = connection.execute(query, params or {})
-            if cursor.returns_rows:
-                for row in cursor:
-                    result.append(dict(row))
+        from sqlalchemy import text
         
-        return result
+        with self.engine.connect().execution_options(stream_results=True) as connection:
+            cursor = connection.execute(text(query), params or {})
+            if not cursor.returns_rows:
+                return
+            for partition in cursor.mappings().yield_per(batch_size).partitions():
+                yield [dict(row) for row in partition]
     
     def create_tables(self) -> None:
         """
         Create all database tables.
         """
         if self.db_type in ["sqlite", "postgresql"]:
+            from data_analysis_chatbot.database.models import Base
+            
             Base.metadata.create_all(self.engine)
             logger.info("Database tables created")
         else:
@@ -153,6 +214,8 @@ class DatabaseManager:
         Drop all database tables.
         """
         if self.db_type in ["sqlite", "postgresql"]:
+            from data_analysis_chatbot.database.models import Base
+            
             Base.metadata.drop_all(self.engine)
             logger.info("Database tables dropped")
         else:
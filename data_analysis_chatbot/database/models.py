@@ -2,18 +2,92 @@
 Database models for the application.
 """
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, JSON
+from operator import attrgetter
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, inspect
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.types import TypeDecorator
+
+from data_analysis_chatbot.json_utils import json_dumps, json_loads
 
 Base = declarative_base()
 
-class User(Base):
+# Bump whenever table definitions change so that create_all runs again
+SCHEMA_VERSION = 1
+
+
+class FastJSON(TypeDecorator):
+    """
+    JSON column stored as text and (de)serialized with orjson when available.
+    """
+    impl = Text
+    cache_ok = True
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return json_dumps(value)
+    
+    def process_result_value(self, value: Optional[str], dialect) -> Any:
+        if value is None:
+            return None
+        return json_loads(value)
+
+
+def _iso(value: Any) -> Any:
+    """Convert datetime values to ISO 8601 strings, leaving others unchanged."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class SerializableMixin:
+    """
+    Mixin providing a column-driven to_dict for models.
+    
+    The serialized column names and a bulk attribute getter are built once
+    per class on first use, as the mapper is not configured yet while the
+    class body is being created.
+    """
+    # Attribute names left out of to_dict
+    __serialize_exclude__: Tuple[str, ...] = ()
+    
+    @classmethod
+    def _serializer(cls) -> Tuple[Tuple[str, ...], attrgetter]:
+        """Return the cached (column names, attribute getter) pair for the class."""
+        serializer = cls.__dict__.get("_serializer_cache")
+        if serializer is None:
+            props = [
+                prop for prop in inspect(cls).column_attrs
+                if prop.key not in cls.__serialize_exclude__
+            ]
+            serializer = (
+                tuple(prop.columns[0].name for prop in props),
+                attrgetter(*(prop.key for prop in props)),
+            )
+            cls._serializer_cache = serializer
+        return serializer
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the model object to a dictionary."""
+        names, getter = self._serializer()
+        return {name: _iso(value) for name, value in zip(names, getter(self))}
+
+class SchemaMeta(Base):
+    """
+    Sentinel table recording which schema versions have been applied.
+    """
+    __tablename__ = "_schema_meta"
+    
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+class User(SerializableMixin, Base):
     """
     User model for storing user information.
     """
     __tablename__ = "users"
+    __serialize_exclude__ = ("password_hash",)
     
     id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
@@ -27,21 +101,9 @@ class User(Base):
     # Relationships
     conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan")
     datasets = relationship("Dataset", back_populates="user", cascade="all, delete-orphan")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert User object to dictionary."""
-        return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "is_active": self.is_active,
-            "is_admin": self.is_admin,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
 
 
-class Conversation(Base):
+class Conversation(SerializableMixin, Base):
     """
     Conversation model for storing chat conversations.
     """
@@ -56,19 +118,9 @@ class Conversation(Base):
     # Relationships
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert Conversation object to dictionary."""
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "title": self.title,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
 
 
-class Message(Base):
+class Message(SerializableMixin, Base):
     """
     Message model for storing chat messages.
     """
@@ -82,19 +134,9 @@ class Message(Base):
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert Message object to dictionary."""
-        return {
-            "id": self.id,
-            "conversation_id": self.conversation_id,
-            "role": self.role,
-            "content": self.content,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
 
 
-class Dataset(Base):
+class Dataset(SerializableMixin, Base):
     """
     Dataset model for storing user datasets.
     """
@@ -106,30 +148,16 @@ class Dataset(Base):
     description = Column(Text)
     file_path = Column(String(255))
     file_type = Column(String(50))  # csv, excel, json, etc.
-    metadata = Column(JSON)
+    meta_data = Column("metadata", FastJSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="datasets")
     analyses = relationship("Analysis", back_populates="dataset", cascade="all, delete-orphan")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert Dataset object to dictionary."""
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "name": self.name,
-            "description": self.description,
-            "file_path": self.file_path,
-            "file_type": self.file_type,
-            "metadata": self.metadata,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
-
-
-class Analysis(Base):
+
+
+class Analysis(SerializableMixin, Base):
     """
     Analysis model for storing data analysis results.
     """
@@ -140,30 +168,16 @@ class Analysis(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text)
     query = Column(Text)
-    result = Column(JSON)
+    result = Column(FastJSON)
     visualization_type = Column(String(50))  # bar, line, scatter, etc.
-    visualization_config = Column(JSON)
+    visualization_config = Column(FastJSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     dataset = relationship("Dataset", back_populates="analyses")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert Analysis object to dictionary."""
-        return {
-            "id": self.id,
-            "dataset_id": self.dataset_id,
-            "name": self.name,
-            "description": self.description,
-            "query": self.query,
-            "result": self.result,
-            "visualization_type": self.visualization_type,
-            "visualization_config": self.visualization_config,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
-
-
-class Document(Base):
+
+
+class Document(SerializableMixin, Base):
     """
     Document model for storing documents for RAG.
     """
@@ -172,19 +186,7 @@ class Document(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String(255))
     content = Column(Text, nullable=False)
-    metadata = Column(JSON)
+    meta_data = Column("metadata", FastJSON)
     source = Column(String(255))
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert Document object to dictionary."""
-        return {
-            "id": self.id,
-            "title": self.title,
-            "content": self.content,
-            "metadata": self.metadata,
-            "source": self.source,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+JSON serialization helpers, backed by orjson when it is installed.
+"""
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document.
+    
+    Args:
+        data: JSON text or UTF-8 encoded bytes
+        
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Serialize an object to a JSON string.
+    
+    With orjson, non-string dict keys and NumPy values are serialized
+    directly.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(obj)
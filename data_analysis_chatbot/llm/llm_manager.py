@@ -2,15 +2,9 @@
 LLM client and operations.
 """
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
 
-from langchain.llms import OpenAI
-from langchain.chat_models import ChatOpenAI
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
-
 
 class LLMManager:
     """
@@ -30,6 +24,10 @@ class LLMManager:
         self.temperature = config.get("temperature", 0.7)
         self.max_tokens = config.get("max_tokens", 2000)
         
+        # Compiled chains keyed by (template, input variable names)
+        self.chain_cache_size = config.get("chain_cache_size", 128)
+        self._chain_cache: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+        
         self.llm = self._init_llm()
         logger.info(f"LLM initialized: {self.provider} - {self.model_name}")
     
@@ -45,7 +43,10 @@ class LLMManager:
             if not api_key:
                 raise ValueError("OpenAI API key not provided")
             
+            # Provider backends are imported on demand to keep startup cheap
             if "gpt" in self.model_name.lower() or "turbo" in self.model_name.lower():
+                from langchain.chat_models import ChatOpenAI
+                
                 return ChatOpenAI(
                     model_name=self.model_name,
                     temperature=self.temperature,
@@ -53,6 +54,8 @@ class LLMManager:
                     openai_api_key=api_key,
                 )
             else:
+                from langchain.llms import OpenAI
+                
                 return OpenAI(
                     model_name=self.model_name,
                     temperature=self.temperature,
@@ -103,6 +106,96 @@ class LLMManager:
             logger.error(f"Error generating LLM response: {e}")
             return f"Error generating response: {str(e)}"
     
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """
+        Generate responses for several prompts in one batched LLM call.
+        
+        Completion models send the prompts together in one request. Chat
+        models' generate would handle them one at a time, so their requests
+        are issued concurrently from a thread pool instead.
+        
+        Args:
+            prompts: Prompt texts
+            
+        Returns:
+            Generated responses, in prompt order
+        """
+        try:
+            if self._is_chat_model():
+                messages = self.llm.batch(self._batch_inputs(prompts))
+                return [message.content for message in messages]
+            result = self.llm.generate(self._batch_inputs(prompts))
+            return [generations[0].text for generations in result.generations]
+        except Exception as e:
+            logger.error(f"Error generating batched LLM responses: {e}")
+            return [f"Error generating response: {str(e)}"] * len(prompts)
+    
+    async def agenerate_batch(self, prompts: List[str]) -> List[str]:
+        """
+        Asynchronously generate responses for several prompts.
+        
+        Chat model requests are issued concurrently, so the batch takes about
+        as long as its slowest prompt.
+        
+        Args:
+            prompts: Prompt texts
+            
+        Returns:
+            Generated responses, in prompt order
+        """
+        try:
+            result = await self.llm.agenerate(self._batch_inputs(prompts))
+            return [generations[0].text for generations in result.generations]
+        except Exception as e:
+            logger.error(f"Error generating batched LLM responses: {e}")
+            return [f"Error generating response: {str(e)}"] * len(prompts)
+    
+    def generate_samples(self, prompt: str, n: int) -> List[str]:
+        """
+        Generate several independent samples for the same prompt.
+        
+        OpenAI chat models return all samples from a single request using the
+        `n` parameter; other models fall back to a batched call.
+        
+        Args:
+            prompt: Prompt text
+            n: Number of samples
+            
+        Returns:
+            Generated samples
+        """
+        if not self._is_chat_model():
+            return self.generate_batch([prompt] * n)
+        
+        try:
+            result = self.llm.generate(self._batch_inputs([prompt]), n=n)
+            return [generation.text for generation in result.generations[0]]
+        except Exception as e:
+            logger.error(f"Error generating LLM samples: {e}")
+            return [f"Error generating response: {str(e)}"] * n
+    
+    def _is_chat_model(self) -> bool:
+        """Whether the configured LLM is an OpenAI chat model."""
+        model_name = self.model_name.lower()
+        return self.provider == "openai" and ("gpt" in model_name or "turbo" in model_name)
+    
+    def _batch_inputs(self, prompts: List[str]) -> List[Any]:
+        """
+        Convert prompts to the input format expected by the LLM's generate methods.
+        
+        Args:
+            prompts: Prompt texts
+            
+        Returns:
+            Prompts for completion models, single-message lists for chat models
+        """
+        if not self._is_chat_model():
+            return list(prompts)
+        
+        from langchain.schema import HumanMessage
+        
+        return [[HumanMessage(content=prompt)] for prompt in prompts]
+    
     def generate_with_chat_history(
         self, system_message: str, messages: List[Dict[str, str]]
     ) -> str:
@@ -128,6 +221,8 @@ class LLMManager:
             
             return self.generate(full_prompt)
         
+        from langchain.schema import HumanMessage, SystemMessage, AIMessage
+        
         try:
             # Convert messages to langchain format
             langchain_messages = [SystemMessage(content=system_message)]
@@ -158,15 +253,39 @@ class LLMManager:
             Generated response
         """
         try:
-            prompt_template = PromptTemplate(
-                template=template,
-                input_variables=list(input_variables.keys()),
-            )
-            
-            chain = LLMChain(llm=self.llm, prompt=prompt_template)
+            chain = self._get_chain(template, tuple(sorted(input_variables)))
             response = chain.run(**input_variables)
             
             return response
         except Exception as e:
             logger.error(f"Error generating response from template: {e}")
-            return f"Error generating response: {str(e)}"
\ No newline at end of file
+            return f"Error generating response: {str(e)}"
+    
+    def _get_chain(self, template: str, variable_names: Tuple[str, ...]):
+        """
+        Get a cached LLM chain for a template, building it on first use.
+        
+        Args:
+            template: Prompt template string
+            variable_names: Sorted names of the template input variables
+            
+        Returns:
+            LLMChain instance
+        """
+        key = (template, variable_names)
+        chain = self._chain_cache.get(key)
+        if chain is None:
+            from langchain.chains import LLMChain
+            from langchain.prompts import PromptTemplate
+            
+            prompt_template = PromptTemplate(
+                template=template,
+                input_variables=list(variable_names),
+            )
+            chain = LLMChain(llm=self.llm, prompt=prompt_template)
+            
+            if len(self._chain_cache) >= self.chain_cache_size:
+                # Evict the oldest entry
+                self._chain_cache.pop(next(iter(self._chain_cache)))
+            self._chain_cache[key] = chain
+        return chain
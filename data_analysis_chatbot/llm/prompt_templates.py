@@ -1,7 +1,9 @@
 """
 Prompt engineering templates.
 """
-from typing import Dict, Any
+import string
+import sys
+from typing import Dict, Any, List, Optional, Tuple
 
 # System message for data analysis chatbot
 SYSTEM_PROMPT = """You are an intelligent data analysis assistant with expertise in analyzing various types of data. 
@@ -121,6 +123,15 @@ TEMPLATES = {
     "db_analysis": DB_ANALYSIS_TEMPLATE,
 }
 
+# Intern the static templates so every session shares one copy of each
+for _name, _template in TEMPLATES.items():
+    TEMPLATES[_name] = sys.intern(_template)
+
+# UTF-8 encodings of the static templates, for clients that send raw bytes
+TEMPLATES_UTF8: Dict[str, bytes] = {
+    name: template.encode("utf-8") for name, template in TEMPLATES.items()
+}
+
 def get_template(template_name: str) -> str:
     """
     Get a prompt template by name.
@@ -133,10 +144,31 @@ def get_template(template_name: str) -> str:
     """
     return TEMPLATES.get(template_name, "")
 
+def get_template_bytes(template_name: str) -> bytes:
+    """
+    Get the UTF-8 encoded form of a prompt template by name.
+    
+    Args:
+        template_name: Name of the template
+        
+    Returns:
+        Encoded template, empty if the name is unknown
+    """
+    return TEMPLATES_UTF8.get(template_name, b"")
+
+# Templates pre-parsed into (literal, field_name, format_spec, conversion) tuples
+_FORMATTER = string.Formatter()
+_COMPILED_TEMPLATES: Dict[str, List[Tuple[str, Optional[str], Optional[str], Optional[str]]]] = {
+    name: list(_FORMATTER.parse(template)) for name, template in TEMPLATES.items()
+}
+
 def format_template(template_name: str, variables: Dict[str, Any]) -> str:
     """
     Format a template with the provided variables.
     
+    Uses the template's pre-parsed form, so the template text is not
+    re-scanned on every call. Behaves like str.format otherwise.
+    
     Args:
         template_name: Name of the template
         variables: Variables to substitute in the template
@@ -144,5 +176,23 @@ def format_template(template_name: str, variables: Dict[str, Any]) -> str:
     Returns:
         Formatted template string
     """
-    template = get_template(template_name)
-    return template.format(**variables)
\ No newline at end of file
+    compiled = _COMPILED_TEMPLATES.get(template_name)
+    if compiled is None:
+        return get_template(template_name).format(**variables)
+    
+    parts = []
+    for literal, field_name, format_spec, conversion in compiled:
+        parts.append(literal)
+        if field_name is None:
+            continue
+        if field_name in variables:
+            value = variables[field_name]
+        else:
+            # Attribute/index lookups such as {obj.attr}; raises KeyError if missing
+            value, _ = _FORMATTER.get_field(field_name, (), variables)
+        if conversion:
+            value = _FORMATTER.convert_field(value, conversion)
+        if format_spec and "{" in format_spec:
+            format_spec = format_spec.format(**variables)
+        parts.append(format(value, format_spec or ""))
+    return "".join(parts)
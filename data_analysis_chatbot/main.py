@@ -6,11 +6,6 @@ import os
 from loguru import logger
 
 from data_analysis_chatbot.config import load_config
-from data_analysis_chatbot.database.db_manager import DatabaseManager
-from data_analysis_chatbot.rag.document_store import DocumentStore
-from data_analysis_chatbot.llm.llm_manager import LLMManager
-from data_analysis_chatbot.api.routes import start_api_server
-from data_analysis_chatbot.ui.app import start_ui
 
 def setup_logger():
     """Configure the application logger."""
@@ -31,6 +26,11 @@ def setup_logger():
 
 def init_application():
     """Initialize all components of the application."""
+    # Imported here so that --help does not load the ML and database stacks
+    from data_analysis_chatbot.database.db_manager import DatabaseManager
+    from data_analysis_chatbot.rag.document_store import DocumentStore
+    from data_analysis_chatbot.llm.llm_manager import LLMManager
+    
     # Load configuration
     config = load_config()
     
@@ -89,9 +89,11 @@ def main():
     
     # Start servers based on the selected mode
     if args.mode in ["api", "both"]:
+        from data_analysis_chatbot.api.routes import start_api_server
         start_api_server(app_components, port=args.port)
     
     if args.mode in ["ui", "both"]:
+        from data_analysis_chatbot.ui.app import start_ui
         start_ui(app_components, port=args.ui_port)
 
 if __name__ == "__main__":
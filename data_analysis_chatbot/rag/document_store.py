@@ -1,25 +1,104 @@
 """
 Document store for managing documents for RAG.
 """
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+from itertools import repeat
+import multiprocessing
 import os
-from typing import Dict, Any, List, Optional, Union
+import sys
+from typing import Dict, Any, List, Optional, Tuple, Union
 from pathlib import Path
 import json
-import uuid
 from loguru import logger
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document as LangchainDocument
-from langchain.document_loaders import (
-    TextLoader,
-    PyPDFLoader,
-    CSVLoader,
-    UnstructuredExcelLoader,
-    UnstructuredMarkdownLoader,
-    UnstructuredHTMLLoader,
-)
-
+from data_analysis_chatbot.rag.text_splitter import RegexTextSplitter
 from data_analysis_chatbot.rag.vectordb import VectorDBManager
+from data_analysis_chatbot.uuid_utils import new_uuid
+
+# Supported file types and their loaders, imported lazily
+_EXT_LOADERS: Dict[str, Tuple[str, str]] = {
+    sys.intern(ext): spec
+    for ext, spec in {
+        ".txt": ("langchain.document_loaders", "TextLoader"),
+        ".pdf": ("data_analysis_chatbot.rag.loaders", "AdaptivePDFLoader"),
+        ".csv": ("langchain.document_loaders", "CSVLoader"),
+        ".xlsx": ("langchain.document_loaders", "UnstructuredExcelLoader"),
+        ".xls": ("langchain.document_loaders", "UnstructuredExcelLoader"),
+        ".md": ("langchain.document_loaders", "UnstructuredMarkdownLoader"),
+        ".html": ("langchain.document_loaders", "UnstructuredHTMLLoader"),
+        ".htm": ("langchain.document_loaders", "UnstructuredHTMLLoader"),
+    }.items()
+}
+
+# Loader classes resolved so far, keyed by (module, class name)
+_LOADER_CACHE: Dict[Tuple[str, str], type] = {}
+
+
+def _resolve_loader(spec: Tuple[str, str]) -> type:
+    """
+    Import a document loader class on first use.
+    
+    Loader modules pull in heavy parsing dependencies (pdfium, unstructured),
+    so they are only imported when a file of that type is added.
+    
+    Args:
+        spec: (module path, class name) of the loader
+        
+    Returns:
+        Loader class
+    """
+    loader_cls = _LOADER_CACHE.get(spec)
+    if loader_cls is None:
+        module_name, class_name = spec
+        loader_cls = getattr(importlib.import_module(module_name), class_name)
+        _LOADER_CACHE[spec] = loader_cls
+    return loader_cls
+
+
+def _load_and_split(
+    loader_spec: Tuple[str, str],
+    file_path: str,
+    metadata: Dict[str, Any],
+    chunk_size: int,
+    chunk_overlap: int,
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Load a file and split it into chunks tagged with the document metadata.
+    
+    Module-level so it can run in worker processes.
+    
+    Args:
+        loader_spec: (module path, class name) of the loader
+        file_path: Path to the file
+        metadata: Document metadata added to every chunk
+        chunk_size: Maximum chunk size in characters
+        chunk_overlap: Overlap between consecutive chunks
+        
+    Returns:
+        Tuple of (chunk texts, chunk metadatas)
+    """
+    loader = _resolve_loader(loader_spec)(file_path)
+    documents = loader.load()
+    
+    # Split the documents, keeping each chunk's source document metadata
+    text_splitter = RegexTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    texts = []
+    source_metadatas = []
+    for doc in documents:
+        chunks = text_splitter.split_text(doc.page_content)
+        texts.extend(chunks)
+        source_metadatas.extend([doc.metadata] * len(chunks))
+    
+    # Add document metadata and chunk ID
+    metadatas = [
+        {**source_metadata, **metadata, "chunk_id": i}
+        for i, source_metadata in enumerate(source_metadatas)
+    ]
+    return texts, metadatas
 
 
 class DocumentStore:
@@ -37,27 +116,19 @@ class DocumentStore:
         self.config = config
         self.chunk_size = config.get("chunk_size", 1000)
         self.chunk_overlap = config.get("chunk_overlap", 200)
+        self.ingest_workers = config.get("ingest_workers", os.cpu_count() or 1)
         
         # Initialize vector database
         self.vector_db_manager = VectorDBManager(config.get("vector_db", {}))
         
         # Initialize text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = RegexTextSplitter(
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
         )
         
         # Supported file types and their loaders
-        self.file_loaders = {
-            ".txt": TextLoader,
-            ".pdf": PyPDFLoader,
-            ".csv": CSVLoader,
-            ".xlsx": UnstructuredExcelLoader,
-            ".xls": UnstructuredExcelLoader,
-            ".md": UnstructuredMarkdownLoader,
-            ".html": UnstructuredHTMLLoader,
-            ".htm": UnstructuredHTMLLoader,
-        }
+        self.file_loaders = dict(_EXT_LOADERS)
         
         logger.info("Document store initialized")
     
@@ -73,23 +144,17 @@ class DocumentStore:
             Document ID
         """
         metadata = metadata or {}
-        doc_id = str(uuid.uuid4())
+        doc_id = new_uuid()
         metadata["doc_id"] = doc_id
         
         # Split the document into chunks
         texts = self.text_splitter.split_text(content)
-        documents = [
-            LangchainDocument(
-                page_content=text,
-                metadata={**metadata, "chunk_id": i}
-            )
-            for i, text in enumerate(texts)
-        ]
-        
-        # Add documents to vector store
-        self.vector_db_manager.add_documents(documents)
-        
-        logger.info(f"Added document with ID: {doc_id}, chunks: {len(documents)}")
+        metadatas = [{**metadata, "chunk_id": i} for i in range(len(texts))]
+        
+        # Add chunks to vector store
+        self.vector_db_manager.add_texts(texts, metadatas)
+        
+        logger.info(f"Added document with ID: {doc_id}, chunks: {len(texts)}")
         return doc_id
     
     def add_file(self, file_path: Union[str, Path], metadata: Optional[Dict[str, Any]] = None) -> str:
@@ -103,37 +168,97 @@ class DocumentStore:
         Returns:
             Document ID
         """
+        file_path, loader_spec, metadata = self._prepare_file(file_path, metadata)
+        
+        # Load and split the document
+        texts, metadatas = _load_and_split(
+            loader_spec, str(file_path), metadata, self.chunk_size, self.chunk_overlap
+        )
+        
+        # Add chunks to vector store
+        self.vector_db_manager.add_texts(texts, metadatas)
+        
+        logger.info(f"Added file {file_path.name} with ID: {metadata['doc_id']}, chunks: {len(texts)}")
+        return metadata["doc_id"]
+    
+    def add_files(
+        self, file_paths: List[Union[str, Path]], metadata: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Add several files to the document store.
+        
+        Files are grouped by loader and loaded and split in parallel spawned
+        worker processes, then all chunks are added to the vector store in a
+        single call.
+        
+        Args:
+            file_paths: Paths to the files
+            metadata: Metadata shared by all files
+            
+        Returns:
+            Document IDs, in the order of file_paths
+        """
+        prepared = [self._prepare_file(path, dict(metadata or {})) for path in file_paths]
+        if not prepared:
+            return []
+        
+        # Files of one type run back to back, so each worker reuses its loader
+        grouped = sorted(prepared, key=lambda item: item[1])
+        jobs = (
+            [spec for _, spec, _ in grouped],
+            [str(path) for path, _, _ in grouped],
+            [meta for _, _, meta in grouped],
+            repeat(self.chunk_size),
+            repeat(self.chunk_overlap),
+        )
+        workers = min(self.ingest_workers, len(grouped))
+        if workers <= 1:
+            chunks_per_file = list(map(_load_and_split, *jobs))
+        else:
+            # Spawn rather than fork: this process runs the vector store's saver
+            # thread and holds the embedding model, whose locks a fork would copy
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                chunks_per_file = list(executor.map(
+                    _load_and_split, *jobs, chunksize=max(1, len(grouped) // (workers * 4))
+                ))
+        
+        texts = [text for file_texts, _ in chunks_per_file for text in file_texts]
+        metadatas = [meta for _, file_metas in chunks_per_file for meta in file_metas]
+        self.vector_db_manager.add_texts(texts, metadatas)
+        
+        logger.info(f"Added {len(prepared)} files, chunks: {len(texts)}")
+        return [meta["doc_id"] for _, _, meta in prepared]
+    
+    def _prepare_file(
+        self, file_path: Union[str, Path], metadata: Optional[Dict[str, Any]]
+    ) -> Tuple[Path, Tuple[str, str], Dict[str, Any]]:
+        """
+        Validate a file's type and build its document metadata.
+        
+        Args:
+            file_path: Path to the file
+            metadata: Document metadata
+            
+        Returns:
+            Tuple of (path, loader spec, metadata with source and doc_id)
+        """
         file_path = Path(file_path)
         metadata = metadata or {}
         
         # Get file extension
-        file_ext = file_path.suffix.lower()
-        if file_ext not in self.file_loaders:
+        file_ext = sys.intern(file_path.suffix.lower())
+        loader_spec = self.file_loaders.get(file_ext)
+        if loader_spec is None:
             raise ValueError(f"Unsupported file type: {file_ext}")
         
         # Add file metadata
         metadata["source"] = str(file_path)
         metadata["filename"] = file_path.name
-        doc_id = str(uuid.uuid4())
-        metadata["doc_id"] = doc_id
-        
-        # Load and split the document
-        loader_cls = self.file_loaders[file_ext]
-        loader = loader_cls(str(file_path))
-        documents = loader.load()
+        metadata["doc_id"] = new_uuid()
         
-        # Split the documents
-        split_documents = self.text_splitter.split_documents(documents)
-        
-        # Add chunk ID to metadata
-        for i, doc in enumerate(split_documents):
-            doc.metadata.update({"chunk_id": i})
-        
-        # Add documents to vector store
-        self.vector_db_manager.add_documents(split_documents)
-        
-        logger.info(f"Added file {file_path.name} with ID: {doc_id}, chunks: {len(split_documents)}")
-        return doc_id
+        return file_path, loader_spec, metadata
     
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -150,6 +275,19 @@ class DocumentStore:
         
         return results
     
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Search for documents similar to each of several queries.
+        
+        Args:
+            queries: Query strings
+            top_k: Number of results to return per query
+            
+        Returns:
+            One list of document chunks with similarity scores per query
+        """
+        return self.vector_db_manager.search_batch(queries, top_k=top_k)
+    
     def delete_document(self, doc_id: str) -> bool:
         """
         Delete a document from the store.
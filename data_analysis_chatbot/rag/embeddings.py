@@ -1,9 +1,127 @@
 """
 Embedding models for RAG.
 """
+import os
 from typing import Dict, Any, List
+import numpy as np
 from loguru import logger
 from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """
+    MiniLM sentence embeddings served by an int8-quantized ONNX export.
+    
+    Inference runs on the ONNX Runtime CPU provider; mean pooling and L2
+    normalisation are done in NumPy.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "Xenova/all-MiniLM-L6-v2",
+        file_name: str = "model_quantized.onnx",
+        subfolder: str = "onnx",
+        batch_size: int = 32,
+        max_length: int = 256,
+    ):
+        """
+        Load the quantized model and its tokenizer.
+        
+        Args:
+            model_name: Hugging Face repo or local directory with the ONNX export
+            file_name: ONNX model file inside the subfolder
+            subfolder: Folder holding the ONNX files
+            batch_size: Number of texts per forward pass
+            max_length: Maximum number of tokens per text
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The onnx_int8 embedding backend requires optimum[onnxruntime]; "
+                "install it with `pip install data_analysis_chatbot[onnx]`"
+            ) from e
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_name,
+            subfolder=subfolder,
+            file_name=file_name,
+            provider="CPUExecutionProvider",
+        )
+        self.batch_size = batch_size
+        self.max_length = max_length
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of texts.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            List of embeddings
+        """
+        if not texts:
+            return []
+        return np.concatenate([
+            self._embed(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        return self._embed([text])[0].tolist()
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Run one forward pass and pool the token states into sentence vectors.
+        
+        Args:
+            texts: Batch of texts
+            
+        Returns:
+            Array of shape (len(texts), dim) with unit-length rows
+        """
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        hidden = self.model(**inputs).last_hidden_state
+        
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def onnx_embeddings_from_config(config: Dict[str, Any]) -> OnnxMiniLMEmbeddings:
+    """
+    Build ONNX embeddings from the onnx_* configuration keys.
+    
+    Args:
+        config: Embedding or vector database configuration
+        
+    Returns:
+        OnnxMiniLMEmbeddings instance
+    """
+    return OnnxMiniLMEmbeddings(
+        model_name=config.get("onnx_model", "Xenova/all-MiniLM-L6-v2"),
+        file_name=config.get("onnx_file_name", "model_quantized.onnx"),
+    )
 
 
 class EmbeddingManager:
@@ -21,6 +139,7 @@ class EmbeddingManager:
         self.config = config
         self.embedding_type = config.get("type", "huggingface").lower()
         self.model_name = config.get("model_name", "sentence-transformers/all-MiniLM-L6-v2")
+        self.backend = config.get("embedding_backend", "torch")
         
         self.embeddings = self._init_embeddings()
         logger.info(f"Embedding model initialized: {self.embedding_type}")
@@ -33,6 +152,8 @@ class EmbeddingManager:
             Embedding model instance
         """
         if self.embedding_type == "huggingface":
+            if self.backend == "onnx_int8":
+                return onnx_embeddings_from_config(self.config)
             return HuggingFaceEmbeddings(model_name=self.model_name)
         elif self.embedding_type == "openai":
             api_key = self.config.get("api_key") or os.environ.get("OPENAI_API_KEY")
@@ -0,0 +1,166 @@
+"""
+Document loaders for file types where the langchain defaults are slow.
+"""
+from pathlib import Path
+from typing import Iterator, List, Union
+
+from loguru import logger
+from langchain.docstore.document import Document as LangchainDocument
+from langchain.document_loaders.base import BaseLoader
+
+# Pages inspected by classify_pdf
+PDF_SAMPLE_PAGES = 3
+# A page with images and less extractable text than this is treated as scanned
+PDF_MIN_TEXT_CHARS = 100
+# A page with more vector paths than this (table rulings) is treated as tabular
+PDF_MAX_PATHS = 200
+
+
+def classify_pdf(file_path: Union[str, Path], sample_pages: int = PDF_SAMPLE_PAGES) -> str:
+    """
+    Classify a PDF by how hard it is to parse.
+    
+    The first pages are sampled with pdfium. A page with images but almost
+    no text layer looks scanned, and a page with many vector paths looks
+    like a ruled table; either makes the document "heavy".
+    
+    Args:
+        file_path: Path to the PDF file
+        sample_pages: Number of leading pages to inspect
+        
+    Returns:
+        "light" or "heavy"
+    """
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+    
+    pdf = pdfium.PdfDocument(str(file_path))
+    try:
+        for page_number in range(min(sample_pages, len(pdf))):
+            page = pdf[page_number]
+            textpage = page.get_textpage()
+            try:
+                text_chars = textpage.count_chars()
+                images = paths = 0
+                for obj in page.get_objects(
+                    filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE, pdfium_c.FPDF_PAGEOBJ_PATH)
+                ):
+                    if obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+                        images += 1
+                    else:
+                        paths += 1
+            finally:
+                textpage.close()
+                page.close()
+            
+            if images and text_chars < PDF_MIN_TEXT_CHARS:
+                return "heavy"
+            if paths > PDF_MAX_PATHS:
+                return "heavy"
+    finally:
+        pdf.close()
+    return "light"
+
+
+class FastPDFLoader(BaseLoader):
+    """
+    PDF loader backed by pypdfium2 (PDFium), producing one document per page.
+    
+    Drop-in replacement for PyPDFLoader: pages carry the same "source" and
+    "page" metadata.
+    """
+    
+    def __init__(self, file_path: str):
+        """
+        Initialize the loader.
+        
+        Args:
+            file_path: Path to the PDF file
+        """
+        self.file_path = str(file_path)
+    
+    def lazy_load(self) -> Iterator[LangchainDocument]:
+        """
+        Extract the text of each page in order.
+        
+        Yields:
+            One document per page
+        """
+        import pypdfium2 as pdfium
+        
+        pdf = pdfium.PdfDocument(self.file_path)
+        try:
+            for page_number in range(len(pdf)):
+                page = pdf[page_number]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+                
+                yield LangchainDocument(
+                    page_content=text,
+                    metadata={"source": self.file_path, "page": page_number},
+                )
+        finally:
+            pdf.close()
+    
+    def load(self) -> List[LangchainDocument]:
+        """
+        Load all pages.
+        
+        Returns:
+            One document per page
+        """
+        return list(self.lazy_load())
+
+
+class AdaptivePDFLoader(BaseLoader):
+    """
+    PDF loader that picks a parser per file.
+    
+    Text-layer PDFs go through FastPDFLoader. Scanned or table-heavy ones
+    (see classify_pdf) go through UnstructuredPDFLoader, which can OCR and
+    keeps table text together, when unstructured is installed.
+    """
+    
+    def __init__(self, file_path: str):
+        """
+        Initialize the loader.
+        
+        Args:
+            file_path: Path to the PDF file
+        """
+        self.file_path = str(file_path)
+    
+    def lazy_load(self) -> Iterator[LangchainDocument]:
+        """
+        Load the PDF with the parser suited to it.
+        
+        Yields:
+            Loaded documents
+        """
+        if classify_pdf(self.file_path) == "heavy":
+            from langchain.document_loaders import UnstructuredPDFLoader
+            
+            try:
+                documents = UnstructuredPDFLoader(self.file_path).load()
+            except ImportError:
+                logger.warning(
+                    f"unstructured is not installed, parsing {self.file_path} with pdfium"
+                )
+            else:
+                yield from documents
+                return
+        
+        yield from FastPDFLoader(self.file_path).lazy_load()
+    
+    def load(self) -> List[LangchainDocument]:
+        """
+        Load the PDF.
+        
+        Returns:
+            Loaded documents
+        """
+        return list(self.lazy_load())
@@ -45,6 +45,27 @@ class DocumentRetriever:
         logger.debug(f"Retrieved {len(results)} documents for query: {query}")
         return results
     
+    def retrieve_batch(
+        self, queries: List[str], top_k: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve documents relevant to each of several queries in one pass.
+        
+        Args:
+            queries: Query strings
+            top_k: Number of results to return per query (overrides config)
+            
+        Returns:
+            One list of document chunks with similarity scores per query
+        """
+        if top_k is None:
+            top_k = self.top_k
+        
+        results = self.document_store.search_batch(queries, top_k=top_k)
+        
+        logger.debug(f"Retrieved documents for {len(queries)} queries")
+        return results
+    
     def retrieve_and_format(self, query: str, top_k: Optional[int] = None) -> str:
         """
         Retrieve documents and format them for inclusion in a prompt.
@@ -61,13 +82,8 @@ class DocumentRetriever:
         if not results:
             return "No relevant information found."
         
-        formatted_results = []
-        for i, result in enumerate(results):
-            content = result["content"]
-            source = result["metadata"].get("source", "Unknown")
-            score = result["score"]
-            
-            formatted_result = f"Document {i+1} (Source: {source}, Relevance: {score:.2f}):\n{content}\n"
-            formatted_results.append(formatted_result)
-        
-        return "\n".join(formatted_results)
\ No newline at end of file
+        return "\n".join(
+            f"Document {i} (Source: {result['metadata'].get('source', 'Unknown')}, "
+            f"Relevance: {result['score']:.2f}):\n{result['content']}\n"
+            for i, result in enumerate(results, 1)
+        )
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Text splitting for RAG document chunking.
+"""
+from collections import deque
+import re
+from typing import List, Pattern, Sequence
+
+from langchain.docstore.document import Document as LangchainDocument
+
+# Split points from coarsest to finest: paragraphs, lines, sentence ends, words
+DEFAULT_SEPARATORS = (
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?])\s+"),
+    re.compile(r"\s+"),
+)
+
+
+class RegexTextSplitter:
+    """
+    Text splitter driven by precompiled separator patterns.
+
+    Text is split on the coarsest separator first, and only pieces still
+    longer than chunk_size are split on finer ones (finally cut at
+    chunk_size). The pieces are then packed into chunks of at most
+    chunk_size characters, carrying up to chunk_overlap characters of
+    context into the next chunk. This mirrors RecursiveCharacterTextSplitter,
+    but every scan runs in the C regex engine.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Sequence[Pattern] = DEFAULT_SEPARATORS,
+    ):
+        """
+        Initialize the text splitter.
+
+        Args:
+            chunk_size: Maximum chunk size in characters
+            chunk_overlap: Maximum overlap between consecutive chunks
+            separators: Compiled separator patterns, coarsest first
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Chunk overlap ({chunk_overlap}) is larger than chunk size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators)
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List of chunks
+        """
+        return self._merge(self._split(text, 0))
+
+    def split_documents(self, documents: List[LangchainDocument]) -> List[LangchainDocument]:
+        """
+        Split documents into chunk documents, copying each document's metadata.
+
+        Args:
+            documents: Documents to split
+
+        Returns:
+            List of chunk documents
+        """
+        return [
+            LangchainDocument(page_content=chunk, metadata=dict(doc.metadata))
+            for doc in documents
+            for chunk in self.split_text(doc.page_content)
+        ]
+
+    def _split(self, text: str, level: int) -> List[str]:
+        """
+        Split text into pieces no longer than chunk_size.
+
+        Separators stay attached to the end of the preceding piece, so
+        joining the pieces gives back the original text.
+
+        Args:
+            text: Text to split
+            level: Index of the separator pattern to split on
+
+        Returns:
+            List of pieces
+        """
+        if len(text) <= self.chunk_size:
+            return [text]
+        if level >= len(self.separators):
+            return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+        pieces = []
+        start = 0
+        for match in self.separators[level].finditer(text):
+            end = match.end()
+            if end > start:
+                pieces.append(text[start:end])
+                start = end
+        if start < len(text):
+            pieces.append(text[start:])
+
+        result = []
+        for piece in pieces:
+            if len(piece) <= self.chunk_size:
+                result.append(piece)
+            else:
+                result.extend(self._split(piece, level + 1))
+        return result
+
+    def _merge(self, pieces: List[str]) -> List[str]:
+        """
+        Pack pieces into overlapping chunks.
+
+        Args:
+            pieces: Pieces no longer than chunk_size
+
+        Returns:
+            List of stripped, non-empty chunks
+        """
+        chunks = []
+        window = deque()
+        total = 0
+        for piece in pieces:
+            length = len(piece)
+            if window and total + length > self.chunk_size:
+                chunk = "".join(window).strip()
+                if chunk:
+                    chunks.append(chunk)
+                # Keep at most chunk_overlap characters as context for the next chunk
+                while window and (total > self.chunk_overlap or total + length > self.chunk_size):
+                    total -= len(window.popleft())
+            window.append(piece)
+            total += length
+
+        chunk = "".join(window).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
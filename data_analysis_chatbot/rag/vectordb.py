@@ -1,15 +1,28 @@
 """
 Vector database manager for document embeddings.
 """
-from typing import Dict, Any, List, Optional
+import atexit
+from functools import lru_cache
+import queue
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 import os
 from pathlib import Path
+import numpy as np
 from loguru import logger
 
 from langchain.docstore.document import Document
+from langchain.docstore import InMemoryDocstore
 from langchain.vectorstores import Chroma, FAISS
 from langchain.embeddings import HuggingFaceEmbeddings
 
+from data_analysis_chatbot.uuid_utils import new_uuid
+
+# Vectors staged before training a non-IVF quantizer (e.g. SQ8), whose
+# per-dimension ranges are fixed by the training sample
+MIN_QUANTIZER_TRAIN_SIZE = 1000
 
 class VectorDBManager:
     """
@@ -26,17 +39,55 @@ class VectorDBManager:
         self.config = config
         self.db_type = config.get("type", "chroma").lower()
         self.persist_directory = config.get("persist_directory", "data/vectordb")
+        self.index_factory = config.get("index_factory", "IVF4096,PQ48")
+        # Inverted lists probed per query by IVF indexes; trades speed for recall
+        self.nprobe = config.get("nprobe", 16)
+        # Configured FAISS index waiting for enough vectors to be trained
+        self._untrained_index = None
+        # Number of staged vectors at which training the configured index is attempted
+        self._train_at = 0
+        # Background thread training _untrained_index, if one is running
+        self._training_thread: Optional[threading.Thread] = None
+        # FAISS ids are assigned here so they stay stable across removals
+        self._id_to_faiss_id: Dict[str, int] = {}
+        self._next_faiss_id = 0
+        self.batch_size = config.get("batch_size", 64)
+        # Minimum seconds between background saves
+        self.save_debounce_secs = config.get("save_debounce_secs", 5.0)
+        self._dirty = False
+        # Guards the store against being written to disk mid-update
+        self._lock = threading.RLock()
+        # Holds at most one pending save request; further requests coalesce into it
+        self._save_queue = queue.Queue(maxsize=1)
         
         # Ensure the persist directory exists
         os.makedirs(self.persist_directory, exist_ok=True)
         
         # Initialize embedding model
         embedding_model_name = config.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2")
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
+        if config.get("embedding_backend") == "onnx_int8":
+            from data_analysis_chatbot.rag.embeddings import onnx_embeddings_from_config
+            self.embeddings = onnx_embeddings_from_config(config)
+        else:
+            self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
+        
+        # Repeated queries reuse their embedding instead of another forward pass
+        self._embed_query = lru_cache(maxsize=config.get("query_cache_size", 4096))(
+            self._compute_query_embedding
+        )
         
         # Initialize vector database
         self.vectordb = self._init_vectordb()
         
+        # Save in the background so writes do not wait on disk, and persist
+        # whatever is still buffered when the interpreter exits
+        self._closed = threading.Event()
+        self._save_thread = threading.Thread(
+            target=self._save_worker, name="vectordb-saver", daemon=True
+        )
+        self._save_thread.start()
+        atexit.register(self.flush)
+        
         logger.info(f"Vector database initialized: {self.db_type}")
     
     def _init_vectordb(self):
@@ -55,15 +106,18 @@ class VectorDBManager:
             # Check if index exists
             index_file = Path(self.persist_directory) / "index.faiss"
             if index_file.exists():
-                return FAISS.load_local(
+                # The docstore pickle is only ever written by this manager
+                store = FAISS.load_local(
                     self.persist_directory,
                     self.embeddings,
-                    "index"
+                    "index",
+                    allow_dangerous_deserialization=True,
                 )
-            return FAISS.from_documents(
-                [],
-                self.embeddings
-            )
+                self._restore_faiss_training_state(store.index)
+                self._restore_faiss_ids(store)
+                return store
+            # The index is built on the first add, once the embedding dimension is known
+            return None
         else:
             raise ValueError(f"Unsupported vector database type: {self.db_type}")
     
@@ -74,24 +128,371 @@ class VectorDBManager:
         Args:
             documents: List of documents to add
         """
-        if not documents:
+        self.add_texts(
+            [doc.page_content for doc in documents],
+            [doc.metadata for doc in documents],
+        )
+    
+    def add_texts(self, texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Add texts with their metadata to the vector database.
+        
+        Args:
+            texts: List of texts to add
+            metadatas: Metadata for each text
+        """
+        if not texts:
             logger.warning("No documents to add")
             return
         
-        if self.db_type == "chroma":
-            self.vectordb.add_documents(documents)
-        elif self.db_type == "faiss":
-            if not self.vectordb._index:
-                self.vectordb = FAISS.from_documents(
-                    documents,
-                    self.embeddings
-                )
-            else:
-                self.vectordb.add_documents(documents)
-            # Save the index
-            self.vectordb.save_local(self.persist_directory, "index")
+        # Embed in fixed-size batches to bound memory on large ingests
+        for start in range(0, len(texts), self.batch_size):
+            batch_texts = texts[start:start + self.batch_size]
+            batch_metadatas = metadatas[start:start + self.batch_size]
+            with self._lock:
+                if self.db_type == "chroma":
+                    self.vectordb.add_texts(batch_texts, metadatas=batch_metadatas)
+                elif self.db_type == "faiss":
+                    self._add_to_faiss(batch_texts, batch_metadatas)
+        self._mark_dirty()
+        
+        logger.info(f"Added {len(texts)} documents to vector database")
+    
+    def _mark_dirty(self) -> None:
+        """
+        Record unsaved changes and ask the background worker to save them.
+        """
+        self._dirty = True
+        if self._closed.is_set():
+            # No worker after close(); save right away
+            self.flush()
+            return
+        try:
+            self._save_queue.put_nowait(True)
+        except queue.Full:
+            # A save is already pending and will pick these changes up
+            pass
+    
+    def _save_worker(self) -> None:
+        """
+        Save pending changes on request, at most once per debounce interval.
+        
+        Runs until close() posts a None sentinel.
+        """
+        last_save = 0.0
+        while True:
+            if self._save_queue.get() is None:
+                return
+            wait = self.save_debounce_secs - (time.monotonic() - last_save)
+            if wait > 0:
+                # close() cuts the debounce short
+                self._closed.wait(wait)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error saving vector database: {e}")
+            last_save = time.monotonic()
+    
+    def close(self) -> None:
+        """
+        Save pending changes and release the background saver.
+        
+        Stops the worker thread and drops the exit hook, so a closed manager
+        (and its model and index) can be garbage collected. Safe to call
+        more than once.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._save_queue.put(None)
+        self._save_thread.join()
+        # Let a running training finish so the trained index is what gets saved
+        training_thread = self._training_thread
+        if training_thread is not None:
+            training_thread.join()
+        self.flush()
+        atexit.unregister(self.flush)
+    
+    def flush(self) -> None:
+        """
+        Persist pending changes to the persist directory.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            
+            if self.db_type == "chroma":
+                # chromadb >= 0.4 persists on write and no longer needs this
+                persist = getattr(self.vectordb, "persist", None)
+                if persist is not None:
+                    persist()
+            elif self.db_type == "faiss":
+                if self.vectordb is not None:
+                    self.vectordb.save_local(self.persist_directory, "index")
+                else:
+                    # Everything was deleted; drop the stale index files
+                    for suffix in ("faiss", "pkl"):
+                        (Path(self.persist_directory) / f"index.{suffix}").unlink(missing_ok=True)
+            
+            self._dirty = False
+        logger.debug(f"Flushed vector database to {self.persist_directory}")
+    
+    def _add_to_faiss(self, texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Embed texts and add them to the FAISS store, creating it if needed.
+        
+        Args:
+            texts: List of texts to add
+            metadatas: Metadata for each text
+        """
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype="float32")
+        if self.vectordb is None:
+            self.vectordb = self._create_faiss_store(vectors)
+        
+        doc_ids = [new_uuid() for _ in texts]
+        faiss_ids = np.arange(self._next_faiss_id, self._next_faiss_id + len(doc_ids), dtype="int64")
+        self._next_faiss_id += len(doc_ids)
+        
+        self.vectordb.index.add_with_ids(vectors, faiss_ids)
+        self.vectordb.docstore.add({
+            doc_id: Document(page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(doc_ids, texts, metadatas)
+        })
+        self.vectordb.index_to_docstore_id.update(zip(faiss_ids.tolist(), doc_ids))
+        self._id_to_faiss_id.update(zip(doc_ids, faiss_ids.tolist()))
+        
+        if (
+            self._untrained_index is not None
+            and self._training_thread is None
+            and self.vectordb.index.ntotal >= self._train_at
+        ):
+            self._start_training()
+    
+    def _create_faiss_store(self, embeddings: np.ndarray) -> FAISS:
+        """
+        Create an empty FAISS store using the configured index factory.
+        
+        Layouts that need training start out as a flat staging index; the
+        configured index is trained in the background once enough vectors
+        have been added. Indexes without their own id storage are wrapped in
+        an IDMap2 so vectors can be removed by id.
+        
+        Args:
+            embeddings: Embeddings of the first batch of documents
+            
+        Returns:
+            FAISS vector store
+        """
+        import faiss
+        
+        vectors = np.asarray(embeddings, dtype="float32")
+        index = self._new_faiss_index(vectors.shape[1])
+        self._untrained_index = None
+        if not index.is_trained:
+            self._untrained_index = index
+            self._train_at = self._min_train_size(index)
+            index = faiss.IndexFlatL2(vectors.shape[1])
+        if faiss.try_extract_index_ivf(index) is None:
+            index = faiss.IndexIDMap2(index)
+        self._configure_faiss_index(index)
+        self._id_to_faiss_id = {}
+        self._next_faiss_id = 0
+        
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore({}),
+            index_to_docstore_id={},
+        )
+    
+    def _new_faiss_index(self, dimension: int):
+        """
+        Create an empty index from the configured factory string.
+        
+        A product quantizer needs its sub-quantizer count M to divide the
+        embedding dimension; when the configured M does not (e.g. PQ48 with
+        a 1024-dimensional model), the largest divisor of the dimension below
+        it is used instead.
+        
+        Args:
+            dimension: Embedding dimension
+            
+        Returns:
+            FAISS index, untrained if the layout needs training
+        """
+        import faiss
+        
+        spec = self.index_factory
+        match = re.search(r"(?<![A-Za-z])PQ(\d+)", spec)
+        if match is not None and dimension % int(match.group(1)):
+            configured = int(match.group(1))
+            fitted = max(m for m in range(1, configured + 1) if dimension % m == 0)
+            spec = f"{spec[:match.start(1)]}{fitted}{spec[match.end(1):]}"
+            logger.warning(
+                f"PQ{configured} does not divide embedding dimension {dimension}, "
+                f"using {spec} instead of {self.index_factory}"
+            )
+        return faiss.index_factory(dimension, spec)
+    
+    def _min_train_size(self, index) -> int:
+        """
+        Get the number of vectors needed to train an index.
+        
+        Args:
+            index: Untrained FAISS index
+            
+        Returns:
+            Minimum number of training vectors
+        """
+        import faiss
+        
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            # FAISS wants around 39 points per centroid for stable k-means
+            required = max(ivf.nlist, self.config.get("min_train_size", 39 * ivf.nlist))
+        else:
+            # Training on a tiny first batch would clip everything added later
+            required = self.config.get("min_train_size", MIN_QUANTIZER_TRAIN_SIZE)
+        
+        # Product quantizers run k-means with ksub (2^nbits) centroids per sub-space
+        pq = getattr(faiss.downcast_index(ivf if ivf is not None else index), "pq", None)
+        if pq is not None:
+            required = max(required, pq.ksub)
+        return required
+    
+    def _start_training(self) -> None:
+        """
+        Start training the configured index on the staged vectors in the background.
+        
+        Must be called with the lock held. k-means over the training sample
+        can take minutes for large IVF layouts, so it runs without the lock;
+        the staging index keeps serving adds, deletes and searches meanwhile.
+        """
+        staging = self.vectordb.index
+        vectors = staging.index.reconstruct_n(0, staging.ntotal)
+        self._training_thread = threading.Thread(
+            target=self._train_staged_index,
+            args=(self._untrained_index, vectors),
+            name="faiss-trainer",
+            daemon=True,
+        )
+        self._training_thread.start()
+    
+    def _train_staged_index(self, index, vectors: np.ndarray) -> None:
+        """
+        Train an index and move the staged vectors into it.
         
-        logger.info(f"Added {len(documents)} documents to vector database")
+        Vectors keep their ids, so the docstore mapping stays valid. Vectors
+        staged or deleted while training ran are picked up when the index is
+        swapped in. FAISS subsamples the training set itself when it is
+        large. If training fails the vectors stay staged and training is
+        retried once the staging index has doubled.
+        
+        Args:
+            index: Untrained index to train
+            vectors: Training vectors
+        """
+        import faiss
+        
+        try:
+            index.train(vectors)
+        except RuntimeError as e:
+            logger.warning(f"Training FAISS {self.index_factory} index failed, keeping vectors staged: {e}")
+            with self._lock:
+                if self._untrained_index is index:
+                    # Start over from a fresh index, as a failed train can leave it half-trained
+                    self._untrained_index = self._new_faiss_index(index.d)
+                    self._train_at = 2 * len(vectors)
+                self._training_thread = None
+            return
+        
+        with self._lock:
+            self._training_thread = None
+            if self._untrained_index is not index or self.vectordb is None:
+                # The store was rebuilt or emptied while training ran
+                return
+            
+            staging = self.vectordb.index
+            ids = faiss.vector_to_array(staging.id_map)
+            staged = staging.index.reconstruct_n(0, staging.ntotal)
+            if faiss.try_extract_index_ivf(index) is None:
+                index = faiss.IndexIDMap2(index)
+            index.add_with_ids(staged, ids)
+            self._configure_faiss_index(index)
+            
+            self.vectordb.index = index
+            self._untrained_index = None
+            self._mark_dirty()
+        logger.info(f"Trained FAISS {self.index_factory} index on {len(vectors)} vectors")
+    
+    def _restore_faiss_training_state(self, index) -> None:
+        """
+        Configure a loaded index, re-arming training if it is still a staging index.
+        
+        Args:
+            index: FAISS index read from disk
+        """
+        import faiss
+        
+        # A staging index is an IDMap2 over a flat index standing in for an untrained target
+        if isinstance(index, faiss.IndexIDMap2) and isinstance(
+            faiss.downcast_index(index.index), faiss.IndexFlat
+        ):
+            target = self._new_faiss_index(index.d)
+            if not target.is_trained:
+                self._untrained_index = target
+                self._train_at = self._min_train_size(target)
+        self._configure_faiss_index(index)
+    
+    def _restore_faiss_ids(self, store: FAISS) -> None:
+        """
+        Rebuild the id maps of a loaded store.
+        
+        Stores saved before ids were managed here use positional ids and an
+        index without id storage; that index is moved into an IDMap2.
+        
+        Args:
+            store: FAISS store read from disk
+        """
+        import faiss
+        
+        index = store.index
+        if not isinstance(index, faiss.IndexIDMap2) and faiss.try_extract_index_ivf(index) is None:
+            vectors = index.reconstruct_n(0, index.ntotal)
+            inner = faiss.clone_index(index)
+            inner.reset()
+            store.index = faiss.IndexIDMap2(inner)
+            store.index.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+        
+        self._id_to_faiss_id = {
+            doc_id: faiss_id for faiss_id, doc_id in store.index_to_docstore_id.items()
+        }
+        self._next_faiss_id = max(store.index_to_docstore_id, default=-1) + 1
+    
+    def _configure_faiss_index(self, index) -> None:
+        """
+        Apply search-time settings to a FAISS index.
+        
+        Args:
+            index: FAISS index
+        """
+        import faiss
+        
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = self.nprobe
+    
+    def _compute_query_embedding(self, query: str) -> Tuple[float, ...]:
+        """
+        Embed a query string.
+        
+        Args:
+            query: Query string
+            
+        Returns:
+            Query embedding as an immutable tuple, safe to share from the cache
+        """
+        return tuple(self.embeddings.embed_query(query))
     
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -104,18 +505,108 @@ class VectorDBManager:
         Returns:
             List of document chunks with similarity scores
         """
-        results = self.vectordb.similarity_search_with_score(query, k=top_k)
+        contents, metadatas, scores = self.search_arrays(query, top_k=top_k)
+        return [
+            {"content": content, "metadata": metadata, "score": score}
+            for content, metadata, score in zip(contents, metadatas, scores.tolist())
+        ]
+    
+    def search_arrays(
+        self, query: str, top_k: int = 5
+    ) -> Tuple[List[str], List[Dict[str, Any]], np.ndarray]:
+        """
+        Search for documents similar to the query, returning column-wise results.
         
-        # Format results
-        formatted_results = []
-        for doc, score in results:
-            formatted_results.append({
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "score": float(score),
-            })
+        The underlying store is queried directly, without building a langchain
+        Document per hit.
         
-        return formatted_results
+        Args:
+            query: Query string
+            top_k: Number of results to return
+            
+        Returns:
+            Tuple of (contents, metadatas, float32 distance scores), best match first
+        """
+        if self.vectordb is None:
+            return [], [], np.empty(0, dtype=np.float32)
+        
+        embedding = self._embed_query(query)
+        return self._query_arrays(np.asarray([embedding], dtype=np.float32), top_k)[0]
+    
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Search for documents similar to each of several queries.
+        
+        All queries are embedded in one call and looked up in one batched
+        index query.
+        
+        Args:
+            queries: Query strings
+            top_k: Number of results to return per query
+            
+        Returns:
+            One list of document chunks with similarity scores per query
+        """
+        if self.vectordb is None or not queries:
+            return [[] for _ in queries]
+        
+        vectors = np.asarray(self.embeddings.embed_documents(queries), dtype=np.float32)
+        return [
+            [
+                {"content": content, "metadata": metadata, "score": score}
+                for content, metadata, score in zip(contents, metadatas, scores.tolist())
+            ]
+            for contents, metadatas, scores in self._query_arrays(vectors, top_k)
+        ]
+    
+    def _query_arrays(
+        self, vectors: np.ndarray, top_k: int
+    ) -> List[Tuple[List[str], List[Dict[str, Any]], np.ndarray]]:
+        """
+        Look up the nearest documents for a matrix of query embeddings.
+        
+        Args:
+            vectors: Query embeddings, one per row
+            top_k: Number of results to return per query
+            
+        Returns:
+            One (contents, metadatas, float32 distance scores) tuple per query
+        """
+        if self.db_type == "chroma":
+            result = self.vectordb._collection.query(
+                query_embeddings=vectors.tolist(),
+                n_results=top_k,
+                include=["documents", "metadatas", "distances"],
+            )
+            return [
+                (
+                    documents,
+                    [metadata or {} for metadata in metadatas],
+                    np.asarray(distances, dtype=np.float32),
+                )
+                for documents, metadatas, distances in zip(
+                    result["documents"], result["metadatas"], result["distances"]
+                )
+            ]
+        
+        if self.vectordb._normalize_L2:
+            import faiss
+            vectors = vectors.copy()
+            faiss.normalize_L2(vectors)
+        scores, ids = self.vectordb.index.search(vectors, top_k)
+        
+        docstore = self.vectordb.docstore._dict
+        index_to_docstore_id = self.vectordb.index_to_docstore_id
+        results = []
+        for row_scores, row_ids in zip(scores, ids):
+            found = row_ids != -1
+            docs = [docstore[index_to_docstore_id[i]] for i in row_ids[found].tolist()]
+            results.append((
+                [doc.page_content for doc in docs],
+                [doc.metadata for doc in docs],
+                row_scores[found],
+            ))
+        return results
     
     def delete_documents(self, filter: Dict[str, Any]) -> bool:
         """
@@ -128,32 +619,50 @@ class VectorDBManager:
             True if successful
         """
         if self.db_type == "chroma":
-            self.vectordb._collection.delete(where=filter)
+            with self._lock:
+                self.vectordb._collection.delete(where=filter)
+            self._mark_dirty()
             return True
         elif self.db_type == "faiss":
-            logger.warning("Delete operation not fully supported in FAISS, recreating index")
-            # For FAISS, we need to recreate the index without the deleted documents
-            # This is a limitation of FAISS
-            docs = self.get_all_documents()
-            filtered_docs = [doc for doc in docs if not all(doc["metadata"].get(k) == v for k, v in filter.items())]
-            
-            # Convert to Document objects
-            langchain_docs = [
-                Document(
-                    page_content=doc["content"],
-                    metadata=doc["metadata"]
-                )
-                for doc in filtered_docs
-            ]
-            
-            # Recreate the index
-            self.vectordb = FAISS.from_documents(
-                langchain_docs,
-                self.embeddings
-            )
-            # Save the index
-            self.vectordb.save_local(self.persist_directory, "index")
-            return True
+            with self._lock:
+                if self.vectordb is None:
+                    return True
+                
+                doc_ids = [
+                    doc_id for doc_id, doc in self.vectordb.docstore._dict.items()
+                    if all(doc.metadata.get(k) == v for k, v in filter.items())
+                ]
+                if not doc_ids:
+                    return True
+                
+                import faiss
+                
+                faiss_ids = np.array([self._id_to_faiss_id[doc_id] for doc_id in doc_ids], dtype="int64")
+                try:
+                    self.vectordb.index.remove_ids(faiss.IDSelectorBatch(faiss_ids))
+                except RuntimeError:
+                    # Some layouts (e.g. HNSW) cannot remove vectors
+                    logger.warning("FAISS index does not support removal, recreating index")
+                    removed = set(doc_ids)
+                    kept_docs = [
+                        doc for doc_id, doc in self.vectordb.docstore._dict.items()
+                        if doc_id not in removed
+                    ]
+                    self.vectordb = None
+                    if kept_docs:
+                        self._add_to_faiss(
+                            [doc.page_content for doc in kept_docs],
+                            [doc.metadata for doc in kept_docs],
+                        )
+                    self._mark_dirty()
+                    return True
+                
+                self.vectordb.docstore.delete(doc_ids)
+                for doc_id, faiss_id in zip(doc_ids, faiss_ids.tolist()):
+                    del self.vectordb.index_to_docstore_id[faiss_id]
+                    del self._id_to_faiss_id[doc_id]
+                self._mark_dirty()
+                return True
         
         return False
     
@@ -175,7 +684,7 @@ class VectorDBManager:
                 for doc_id, doc, meta in zip(docs["ids"], docs["documents"], docs["metadatas"])
             ]
         elif self.db_type == "faiss":
-            if not self.vectordb._index:
+            if self.vectordb is None:
                 return []
             
             # For FAISS, we need a different approach
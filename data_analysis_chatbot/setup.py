@@ -1,17 +1,29 @@
+from pathlib import Path
+
 from setuptools import setup, find_packages
 
+HERE = Path(__file__).parent
+
+requirements = [
+    line.strip()
+    for line in (HERE / "requirements.txt").read_text(encoding="utf-8").splitlines()
+    if line.strip() and not line.lstrip().startswith("#")
+]
+
 setup(
     name="data_analysis_chatbot",
     version="0.1.0",
     packages=find_packages(),
     include_package_data=True,
-    install_requires=[
-        line.strip() for line in open("requirements.txt", "r", encoding="utf-8").readlines()
-    ],
+    install_requires=requirements,
+    extras_require={
+        # Quantized ONNX embeddings (rag.embedding_backend = "onnx_int8")
+        "onnx": ["optimum[onnxruntime]>=1.8.0"],
+    },
     author="Sidhhanath tiwari",
     author_email="siddhanathtiwari7709@gmail.com",
     description="A RAG-based data analysis chatbot",
-    long_description=open("README.md", "r", encoding="utf-8").read(),
+    long_description=(HERE / "README.md").read_text(encoding="utf-8"),
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/data-analysis-chatbot",
     classifiers=[
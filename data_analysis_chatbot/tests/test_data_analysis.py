@@ -0,0 +1,102 @@
+"""
+Tests for the data analysis module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_analysis_chatbot.data_analysis import analyzer
+from data_analysis_chatbot.data_analysis.analyzer import DataAnalyzer, _NUMERIC_STATS, _numeric_stats
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def moments_backend(request, monkeypatch):
+    """Run a test with the Numba kernel (when installed) and with the NumPy fallback."""
+    if request.param == "numba":
+        if analyzer._fused_moments is None:
+            pytest.skip("numba is not installed")
+    else:
+        monkeypatch.setattr(analyzer, "_fused_moments", None)
+    return request.param
+
+
+def _pandas_stats(df: pd.DataFrame) -> np.ndarray:
+    """Reference statistics computed by pandas, in _NUMERIC_STATS order."""
+    return np.vstack([
+        getattr(df, stat)().to_numpy(dtype=np.float64, na_value=np.nan)
+        for stat in _NUMERIC_STATS
+    ])
+
+
+def _frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    normal = rng.normal(10.0, 3.0, n_rows)
+    with_nans = rng.exponential(2.0, n_rows)
+    with_nans[::4] = np.nan
+    return pd.DataFrame({
+        "normal": normal,
+        "with_nans": with_nans,
+        "ints": rng.integers(-50, 50, n_rows),
+        "constant": np.full(n_rows, 7.5),
+        "all_nan": np.full(n_rows, np.nan),
+        "nullable": pd.array(
+            [None if i % 3 == 0 else i * 2 for i in range(n_rows)], dtype="Int64"
+        ),
+    })
+
+
+@pytest.mark.parametrize("n_rows", [1, 2, 3, 4, 10, 257])
+def test_numeric_stats_match_pandas(moments_backend, n_rows):
+    df = _frame(n_rows)
+    values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    np.testing.assert_allclose(
+        _numeric_stats(values), _pandas_stats(df), rtol=1e-9, atol=1e-12, equal_nan=True
+    )
+
+
+def test_numeric_stats_empty_frame(moments_backend):
+    stats = _numeric_stats(np.empty((0, 3)))
+
+    assert stats.shape == (len(_NUMERIC_STATS), 3)
+    assert np.isnan(stats).all()
+
+
+def test_parallel_column_blocks_match_pandas(monkeypatch):
+    # The joblib path only runs without the Numba kernel
+    monkeypatch.setattr(analyzer, "_fused_moments", None)
+    df = pd.concat([_frame(50, seed=i).add_suffix(f"_{i}") for i in range(4)], axis=1)
+    data_analyzer = DataAnalyzer({"n_jobs": 3, "parallel_min_columns": 1})
+
+    np.testing.assert_allclose(
+        data_analyzer._compute_numeric_stats(df), _pandas_stats(df),
+        rtol=1e-9, atol=1e-12, equal_nan=True,
+    )
+
+
+def test_analyze_dataframe(moments_backend):
+    df = _frame(20)
+    df["category"] = ["a", "b", "b", None] * 5
+    df["when"] = pd.date_range("2024-01-01", periods=20, freq="D")
+
+    result = DataAnalyzer().analyze_dataframe(df)
+
+    assert result["shape"] == (20, 8)
+    assert result["null_counts"] == df.isnull().sum().to_dict()
+
+    numeric = result["numeric_analysis"]
+    assert numeric["normal"]["mean"] == pytest.approx(df["normal"].mean())
+    assert numeric["constant"]["std"] == 0.0
+    assert numeric["constant"]["skew"] == 0.0
+    # Undefined statistics are reported as None
+    assert all(value is None for value in numeric["all_nan"].values())
+
+    category = result["categorical_analysis"]["category"]
+    assert category["unique_count"] == df["category"].nunique()
+    assert category["top_values"] == df["category"].value_counts().head(10).to_dict()
+
+    assert result["datetime_analysis"]["when"] == {
+        "min": "2024-01-01T00:00:00",
+        "max": "2024-01-20T00:00:00",
+        "range_days": 19,
+    }
@@ -0,0 +1,37 @@
+"""
+Tests for the database module.
+"""
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from data_analysis_chatbot.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager({
+        "type": "sqlite",
+        "connection_string": f"sqlite:///{tmp_path / 'chatbot.db'}",
+    })
+    manager.initialize()
+    return manager
+
+
+def test_execute_query_persists_writes(db_manager):
+    db_manager.execute_query("CREATE TABLE notes (id INTEGER, body TEXT)")
+
+    assert db_manager.execute_query(
+        "INSERT INTO notes VALUES (:id, :body)", {"id": 1, "body": "hello"}
+    ) == []
+
+    assert db_manager.execute_query("SELECT * FROM notes") == [{"id": 1, "body": "hello"}]
+
+
+def test_execute_query_rolls_back_failed_statement(db_manager):
+    db_manager.execute_query("CREATE TABLE notes (id INTEGER PRIMARY KEY)")
+    db_manager.execute_query("INSERT INTO notes VALUES (1)")
+
+    with pytest.raises(IntegrityError):
+        db_manager.execute_query("INSERT INTO notes VALUES (1)")
+
+    assert db_manager.execute_query("SELECT id FROM notes") == [{"id": 1}]
@@ -0,0 +1,310 @@
+"""
+Tests for the RAG module.
+"""
+import re
+import threading
+import zlib
+
+import faiss
+import numpy as np
+import pytest
+from langchain.docstore.document import Document as LangchainDocument
+from langchain_core.embeddings import Embeddings
+
+from data_analysis_chatbot.rag import vectordb
+from data_analysis_chatbot.rag.text_splitter import RegexTextSplitter
+from data_analysis_chatbot.rag.vectordb import VectorDBManager
+
+
+SAMPLE_TEXT = (
+    "Sales grew in every region last quarter. The north led with a 12% increase! "
+    "Did the south keep up? It grew 4%.\n"
+    "Returns were flat.\n\n"
+    "Inventory turnover improved as slow-moving stock was cleared. "
+    "Warehouse costs fell for the third quarter in a row.\n\n"
+    "Next year the focus shifts to margins rather than volume."
+) * 5
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(40, 0), (60, 20), (100, 30), (1000, 200)])
+def test_chunks_respect_chunk_size(chunk_size, chunk_overlap):
+    splitter = RegexTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    chunks = splitter.split_text(SAMPLE_TEXT)
+
+    assert chunks
+    for chunk in chunks:
+        assert 0 < len(chunk) <= chunk_size
+        assert chunk == chunk.strip()
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(40, 0), (100, 30)])
+def test_chunks_preserve_words_in_order(chunk_size, chunk_overlap):
+    splitter = RegexTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    chunks = splitter.split_text(SAMPLE_TEXT)
+
+    words = SAMPLE_TEXT.split()
+    if chunk_overlap == 0:
+        assert [word for chunk in chunks for word in chunk.split()] == words
+    else:
+        # Every chunk is a contiguous run of the original words
+        joined = " ".join(words)
+        for chunk in chunks:
+            assert " ".join(chunk.split()) in joined
+        assert chunks[0].split()[0] == words[0]
+        assert chunks[-1].split()[-1] == words[-1]
+
+
+def test_overlap_carries_context():
+    splitter = RegexTextSplitter(chunk_size=30, chunk_overlap=12)
+
+    chunks = splitter.split_text("alpha beta gamma delta epsilon zeta eta theta iota kappa")
+
+    assert chunks == [
+        "alpha beta gamma delta",
+        "gamma delta epsilon zeta eta",
+        "zeta eta theta iota kappa",
+    ]
+
+
+def test_short_text_is_single_chunk():
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=10)
+
+    assert splitter.split_text("  A short note.\n") == ["A short note."]
+    assert splitter.split_text(" \n\n ") == []
+
+
+def test_long_token_is_cut_at_chunk_size():
+    splitter = RegexTextSplitter(chunk_size=10, chunk_overlap=0)
+
+    chunks = splitter.split_text("x" * 25 + " tail")
+
+    assert chunks == ["x" * 10, "x" * 10, "xxxxx tail"]
+
+
+def test_paragraphs_split_before_sentences():
+    splitter = RegexTextSplitter(chunk_size=30, chunk_overlap=0)
+
+    chunks = splitter.split_text("First paragraph here.\n\nSecond one. It has two sentences.")
+
+    assert chunks == ["First paragraph here.", "Second one.", "It has two sentences."]
+
+
+def test_custom_separators():
+    splitter = RegexTextSplitter(chunk_size=5, chunk_overlap=0, separators=[re.compile(r";")])
+
+    assert splitter.split_text("ab;cd;ef") == ["ab;", "cd;ef"]
+
+
+def test_overlap_larger_than_chunk_size_raises():
+    with pytest.raises(ValueError):
+        RegexTextSplitter(chunk_size=10, chunk_overlap=11)
+
+
+def test_split_documents_copies_metadata():
+    splitter = RegexTextSplitter(chunk_size=60, chunk_overlap=0)
+    metadata = {"source": "report.txt", "doc_id": "abc"}
+    documents = [LangchainDocument(page_content=SAMPLE_TEXT, metadata=metadata)]
+
+    chunks = splitter.split_documents(documents)
+
+    assert len(chunks) > 1
+    assert all(chunk.metadata == metadata for chunk in chunks)
+    chunks[0].metadata["page"] = 1
+    assert "page" not in metadata
+    assert chunks[1].metadata == metadata
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic random embeddings keyed on the text, so no model is loaded."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return np.random.default_rng(zlib.crc32(text.encode())).random(16).tolist()
+
+
+@pytest.fixture
+def make_faiss_manager(tmp_path, monkeypatch):
+    """Build FAISS managers over a temporary directory, closing them afterwards."""
+    monkeypatch.setattr(vectordb, "HuggingFaceEmbeddings", lambda model_name: HashEmbeddings())
+    managers = []
+
+    def make(index_factory, **config):
+        manager = VectorDBManager({
+            "type": "faiss",
+            "persist_directory": str(tmp_path / "vectordb"),
+            "index_factory": index_factory,
+            "save_debounce_secs": 0,
+            **config,
+        })
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def _add_docs(manager, start, stop):
+    manager.add_texts(
+        [f"document {i}" for i in range(start, stop)],
+        [{"doc_id": f"doc-{i % 3}", "n": i} for i in range(start, stop)],
+    )
+    # Indexes are trained in the background; wait so assertions see the result
+    training_thread = manager._training_thread
+    if training_thread is not None:
+        training_thread.join()
+
+
+def _assert_id_maps_consistent(manager):
+    store = manager.vectordb
+    docstore_ids = set(store.docstore._dict)
+    assert store.index.ntotal == len(docstore_ids) == len(store.index_to_docstore_id)
+    assert set(store.index_to_docstore_id.values()) == docstore_ids
+    assert manager._id_to_faiss_id == {
+        doc_id: faiss_id for faiss_id, doc_id in store.index_to_docstore_id.items()
+    }
+    assert manager._next_faiss_id > max(store.index_to_docstore_id, default=-1)
+
+
+def _stored_numbers(manager):
+    return sorted(doc["metadata"]["n"] for doc in manager.get_all_documents())
+
+
+FAISS_LAYOUTS = [
+    pytest.param("Flat", {}, id="flat"),
+    pytest.param("SQ8", {}, id="sq8"),
+    pytest.param("IVF8,Flat", {"min_train_size": 16}, id="ivf"),
+    pytest.param("HNSW16", {}, id="hnsw-rebuild"),
+]
+
+
+@pytest.mark.parametrize("index_factory,config", FAISS_LAYOUTS)
+def test_faiss_delete_documents(make_faiss_manager, index_factory, config):
+    manager = make_faiss_manager(index_factory, **config)
+    _add_docs(manager, 0, 30)
+
+    assert manager.delete_documents({"doc_id": "doc-1"})
+
+    _assert_id_maps_consistent(manager)
+    assert _stored_numbers(manager) == [i for i in range(30) if i % 3 != 1]
+    for result in manager.search("document 4", top_k=30):
+        assert result["metadata"]["doc_id"] != "doc-1"
+
+    # Deleting again matches nothing and changes nothing
+    assert manager.delete_documents({"doc_id": "doc-1"})
+    assert manager.vectordb.index.ntotal == 20
+
+    next_id = manager._next_faiss_id
+    _add_docs(manager, 30, 36)
+    _assert_id_maps_consistent(manager)
+    new_ids = [
+        faiss_id for faiss_id, doc_id in manager.vectordb.index_to_docstore_id.items()
+        if manager.vectordb.docstore.search(doc_id).metadata["n"] >= 30
+    ]
+    assert sorted(new_ids) == list(range(next_id, next_id + 6))
+    assert manager.search("document 31", top_k=1)[0]["metadata"]["n"] == 31
+
+
+@pytest.mark.parametrize("index_factory,config", FAISS_LAYOUTS)
+def test_faiss_reload_restores_id_maps(make_faiss_manager, index_factory, config):
+    manager = make_faiss_manager(index_factory, **config)
+    _add_docs(manager, 0, 30)
+    manager.delete_documents({"doc_id": "doc-0"})
+    id_map = dict(manager._id_to_faiss_id)
+    next_id = manager._next_faiss_id
+    manager.close()
+
+    reloaded = make_faiss_manager(index_factory, **config)
+
+    _assert_id_maps_consistent(reloaded)
+    assert reloaded._id_to_faiss_id == id_map
+    assert reloaded._next_faiss_id == next_id
+    assert reloaded.delete_documents({"doc_id": "doc-2"})
+    _assert_id_maps_consistent(reloaded)
+    assert _stored_numbers(reloaded) == [i for i in range(30) if i % 3 == 1]
+
+    _add_docs(reloaded, 30, 33)
+    _assert_id_maps_consistent(reloaded)
+    assert _stored_numbers(reloaded) == [i for i in range(30) if i % 3 == 1] + [30, 31, 32]
+
+
+def test_faiss_delete_keeps_staged_vectors_trainable(make_faiss_manager):
+    manager = make_faiss_manager("IVF8,Flat", min_train_size=16)
+    _add_docs(manager, 0, 12)
+    assert manager._untrained_index is not None
+
+    manager.delete_documents({"doc_id": "doc-0"})
+    _add_docs(manager, 12, 24)
+
+    # 16 vectors are staged by now, so the IVF index has been trained
+    assert manager._untrained_index is None
+    _assert_id_maps_consistent(manager)
+    assert _stored_numbers(manager) == [i for i in range(24) if i >= 12 or i % 3 != 0]
+
+
+def test_faiss_delete_everything_then_reload(make_faiss_manager, tmp_path):
+    manager = make_faiss_manager("Flat")
+    _add_docs(manager, 0, 3)
+    for doc_id in ("doc-0", "doc-1", "doc-2"):
+        manager.delete_documents({"doc_id": doc_id})
+    manager.close()
+
+    reloaded = make_faiss_manager("Flat")
+
+    assert reloaded.get_all_documents() == []
+    assert reloaded._id_to_faiss_id == {}
+    _add_docs(reloaded, 0, 3)
+    _assert_id_maps_consistent(reloaded)
+
+
+def test_faiss_scalar_quantizer_waits_for_training_sample(make_faiss_manager):
+    manager = make_faiss_manager("SQ8", min_train_size=64)
+    _add_docs(manager, 0, 1)
+    assert manager._untrained_index is not None
+
+    _add_docs(manager, 1, 201)
+
+    assert manager._untrained_index is None
+    for i in range(0, 200, 4):
+        assert manager.search(f"document {i}", top_k=1)[0]["metadata"]["n"] == i
+
+
+def test_faiss_training_runs_off_the_caller_thread(make_faiss_manager, monkeypatch):
+    manager = make_faiss_manager("IVF8,Flat", min_train_size=16)
+    _add_docs(manager, 0, 12)
+    index = manager._untrained_index
+    release = threading.Event()
+    train = type(index).train
+
+    def slow_train(self, vectors):
+        release.wait(10)
+        train(self, vectors)
+
+    monkeypatch.setattr(type(index), "train", slow_train)
+    manager.add_texts([f"document {i}" for i in range(12, 20)], [{"n": i} for i in range(12, 20)])
+
+    # The add returned while training is still blocked; the staging index keeps serving
+    assert manager._untrained_index is index
+    manager.add_texts(["document 20"], [{"n": 20}])
+    manager.delete_documents({"n": 3})
+    assert manager.search("document 20", top_k=1)[0]["metadata"]["n"] == 20
+
+    release.set()
+    manager._training_thread.join()
+
+    assert manager._untrained_index is None
+    _assert_id_maps_consistent(manager)
+    assert _stored_numbers(manager) == [i for i in range(21) if i != 3]
+
+
+@pytest.mark.parametrize("dimension,pq_spec", [(16, "PQ4"), (24, "PQ6"), (20, "PQ5")])
+def test_faiss_pq_fitted_to_embedding_dimension(make_faiss_manager, dimension, pq_spec):
+    manager = make_faiss_manager("IVF4,PQ6")
+
+    index = manager._new_faiss_index(dimension)
+
+    assert faiss.downcast_index(index).pq.M == int(pq_spec[2:])
@@ -0,0 +1,44 @@
+"""
+Random UUID generation drawn from a pooled read of the OS entropy source.
+"""
+from collections import deque
+import os
+import uuid
+
+# Number of UUIDs generated per os.urandom call
+_POOL_SIZE = 1024
+
+_UUID_POOL = deque()
+
+# A forked child must not hand out the same ids as its parent; spawned
+# children (and platforms without fork) start with an empty pool anyway
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_UUID_POOL.clear)
+
+
+def _refill() -> None:
+    """
+    Generate a batch of version 4 UUIDs from a single os.urandom call.
+    """
+    data = os.urandom(16 * _POOL_SIZE)
+    _UUID_POOL.extend(
+        str(uuid.UUID(bytes=data[i:i + 16], version=4))
+        for i in range(0, len(data), 16)
+    )
+
+
+def new_uuid() -> str:
+    """
+    Get a random (version 4) UUID string.
+    
+    Equivalent to str(uuid.uuid4()), but the entropy syscall is amortized
+    over a pool of ids.
+    
+    Returns:
+        UUID in hyphenated string form
+    """
+    try:
+        return _UUID_POOL.popleft()
+    except IndexError:
+        _refill()
+        return _UUID_POOL.popleft()